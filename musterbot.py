@@ -1,24 +1,126 @@
 import os
 import logging
+import queue
 import schedule
 import time
 import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from datetime import datetime, timedelta, date
 from slack_bolt import App, Ack
 from slack_bolt.adapter.socket_mode import SocketModeHandler
-from threading import Thread
-from dateutil.parser import parse
+from threading import Thread, Lock, Event
 from calendar import month_name, monthrange
 
 # --- Configuration ---
-SLACK_BOT_TOKEN = os.environ.get("SLACK_BOT_TOKEN")
-SLACK_APP_TOKEN = os.environ.get("SLACK_APP_TOKEN")
-TARGET_CHANNEL_ID = os.environ.get("TARGET_CHANNEL_ID") # The ID of the channel to post in
-REPORTING_USER_ID = os.environ.get("REPORTING_USER_ID") # The user ID to send the summary report to
-DATABASE_FILE = os.environ.get("DATABASE_FILE")
+def _require_env(name):
+    """Returns the value of a required environment variable, failing fast if it is unset."""
+    value = os.environ.get(name)
+    if not value:
+        raise RuntimeError(f"Required environment variable {name} is not set.")
+    return value
+
+SLACK_BOT_TOKEN = _require_env("SLACK_BOT_TOKEN")
+SLACK_APP_TOKEN = _require_env("SLACK_APP_TOKEN")
+TARGET_CHANNEL_ID = _require_env("TARGET_CHANNEL_ID") # The ID of the channel to post in
+REPORTING_USER_ID = _require_env("REPORTING_USER_ID") # The user ID to send the summary report to
+DATABASE_FILE = _require_env("DATABASE_FILE")
 
 # --- Globals --- 
-daily_thread_ts = {}
+DB = None # Persistent connection, opened once in setup_database()
+DB_LOCK = Lock() # Serializes access to DB across Bolt handler threads and the scheduler thread
+HOLIDAY_CACHE_TTL = 3600 # Seconds before the holiday cache is reloaded from the database
+_HOLIDAYS = set() # ISO date strings of all company holidays
+_HOLIDAYS_LOADED_AT = float("-inf") # Never loaded; time.monotonic() can be smaller than the TTL right after boot
+USER_CACHE_TTL = 3600 # Seconds before the workspace user list is rescanned
+_BOT_IDS = set() # Slack user IDs of all bot users in the workspace
+_USER_NAMES = {} # Slack user ID -> user name
+_USERS_LOADED_AT = float("-inf") # Never loaded; time.monotonic() can be smaller than the TTL right after boot
+CHANNEL_MEMBERS_CACHE_TTL = 3600 # Seconds a channel's member list is reused before refetching
+_CHANNEL_MEMBERS_CACHE = {} # Channel ID -> (loaded_at, non-bot member IDs)
+_CONFIG = {} # Cached contents of the config table
+_RESCHEDULE = Event() # Set when the scheduler thread should re-register its jobs
+MESSAGE_BATCH_SIZE = 100 # Max message events written per transaction
+MESSAGE_BATCH_WINDOW = 0.5 # Seconds to keep collecting message events before writing a batch
+_MSG_QUEUE = queue.Queue(maxsize=10000) # Message events waiting to be logged by the worker thread
+DEFAULT_CONFIG = [('checkin_time', '08:00'), ('reminder_time', '10:00'), ('summary_time', '11:00')] # Seeded into the config table if missing
+
+# --- SQL ---
+# Statements used by hot handlers are kept as constants so sqlite3's statement cache reuses them
+SQL_UPSERT_RESPONSE = (
+    "INSERT INTO responses (user_id, user_name, response_date, response_text, details) VALUES (?, ?, ?, ?, ?) "
+    "ON CONFLICT (user_id, response_date) DO UPDATE SET "
+    "user_name = excluded.user_name, response_text = excluded.response_text, details = excluded.details"
+)
+SQL_INSERT_MESSAGE = "INSERT INTO messages (sender_id, sender_name, destination_id, sent_timestamp, message) VALUES (?, ?, ?, ?, ?)"
+
+# --- Check-in Actions ---
+# Buttons that record a status immediately: action_id -> response text
+_SIMPLE_RESPONSE_MAP = {
+    "action_in_normal": "In at Normal Time",
+    "action_wfh": "Working from Home",
+    "action_out_sick": "Out Sick",
+    "action_liberty": "Liberty"
+}
+# Buttons that open a details modal first: action_id -> modal text
+_MODAL_ACTION_MAP = {
+    "action_in_late": {"title": "In Late", "label": "What time do you expect to be in?", "placeholder": "e.g., 10:30 AM"},
+    "action_appointment": {"title": "Appointment", "label": "What are the details of the appointment?", "placeholder": "e.g., Dentist at 2 PM"},
+    "action_other": {"title": "Other Status", "label": "Please provide your status for the day.", "placeholder": "e.g., Working from the airport"}
+}
+# Details modal submissions: callback_id -> response text
+_MODAL_SUBMIT_MAP = {
+    "modal_submit_action_in_late": "In Late", "modal_submit_action_appointment": "Appointment",
+    "modal_submit_action_other": "Other"
+}
+
+# --- Message Templates ---
+# Payloads are built once at import and reused for every post/modal
+CHECKIN_BLOCKS = [
+    {"type": "section", "text": {"type": "mrkdwn", "text": "*Good morning! :sunrise: Please check in for today.*"}},
+    {"type": "actions", "block_id": "check_in_actions", "elements": [
+        {"type": "button", "text": {"type": "plain_text", "text": "In at Normal Time"}, "style": "primary", "action_id": "action_in_normal"},
+        {"type": "button", "text": {"type": "plain_text", "text": "In Late"}, "action_id": "action_in_late"},
+        {"type": "button", "text": {"type": "plain_text", "text": "Working from Home"}, "action_id": "action_wfh"},
+        {"type": "button", "text": {"type": "plain_text", "text": "Appointment"}, "action_id": "action_appointment"},
+        {"type": "button", "text": {"type": "plain_text", "text": "Out Sick"}, "style": "danger", "action_id": "action_out_sick"},
+        {"type": "button", "text": {"type": "plain_text", "text": "Liberty"}, "action_id": "action_liberty"},
+        {"type": "button", "text": {"type": "plain_text", "text": "Other..."}, "action_id": "action_other"}
+    ]}
+]
+
+LEAVE_MODAL_VIEW = {
+    "type": "modal",
+    "callback_id": "leave_modal",
+    "title": {"type": "plain_text", "text": "Register Leave/PTO"},
+    "submit": {"type": "plain_text", "text": "Submit"},
+    "blocks": [
+        {
+            "type": "input",
+            "block_id": "start_date_block",
+            "element": {"type": "datepicker", "action_id": "start_date_picker"},
+            "label": {"type": "plain_text", "text": "Start Date"}
+        },
+        {
+            "type": "input",
+            "block_id": "end_date_block",
+            "element": {"type": "datepicker", "action_id": "end_date_picker"},
+            "label": {"type": "plain_text", "text": "End Date"}
+        }
+    ]
+}
+
+_MODAL_VIEW_CACHE = {
+    action_id: {
+        "type": "modal", "callback_id": f"modal_submit_{action_id}",
+        "title": {"type": "plain_text", "text": config["title"]},
+        "submit": {"type": "plain_text", "text": "Submit"},
+        "blocks": [{"type": "input","block_id": "details_block",
+                    "element": {"type": "plain_text_input","action_id": "details_input", "placeholder": {"type": "plain_text", "text": config["placeholder"]}},
+                    "label": {"type": "plain_text", "text": config["label"]}}]
+    }
+    for action_id, config in _MODAL_ACTION_MAP.items()
+}
 
 # --- Initialization ---
 logging.basicConfig(level=logging.INFO)
@@ -26,30 +128,67 @@ app = App(token=SLACK_BOT_TOKEN)
 
 # --- Database Setup ---
 def db_connect():
-    return sqlite3.connect(DATABASE_FILE) # type: ignore
+    return DB
+
+@contextmanager
+def db_transaction():
+    """Holds DB_LOCK and runs the block in one transaction, rolling back if it or the commit fails."""
+    # The connection is in autocommit mode, so `with conn:` alone would not open a transaction
+    with DB_LOCK:
+        conn = db_connect()
+        conn.execute("BEGIN")
+        try:
+            yield conn
+            conn.execute("COMMIT")
+        finally:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
 
 def setup_database():
     """Initializes the SQLite database and creates tables if they don't exist."""
+    global DB
+    DB = sqlite3.connect(DATABASE_FILE, check_same_thread=False, isolation_level=None)
     conn = db_connect()
     cursor = conn.cursor()
+    # WAL lets the message logger write while the reminder/summary paths read
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.execute("PRAGMA mmap_size=134217728") # 128 MiB
+    cursor.execute("PRAGMA cache_size=-65536") # 64 MiB
     cursor.execute('''
         CREATE TABLE IF NOT EXISTS responses (
             id INTEGER PRIMARY KEY, user_id TEXT NOT NULL, user_name TEXT NOT NULL,
             response_date TEXT NOT NULL, response_text TEXT NOT NULL, details TEXT
         )
     ''')
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = 'idx_responses_user_date'")
+    if cursor.fetchone() is None:
+        # Older databases may hold several rows per user per day; keep only the latest before enforcing uniqueness
+        with db_transaction() as tx:
+            removed = tx.execute('''
+                DELETE FROM responses WHERE id NOT IN (
+                    SELECT MAX(id) FROM responses GROUP BY user_id, response_date
+                )
+            ''').rowcount
+            tx.execute("CREATE UNIQUE INDEX idx_responses_user_date ON responses (user_id, response_date)")
+        logging.info(f"Created idx_responses_user_date; removed {removed} duplicate response rows.")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_responses_date ON responses (response_date)")
     cursor.execute('''
         CREATE TABLE IF NOT EXISTS messages (
             id INTEGER PRIMARY KEY, sender_id TEXT NOT NULL, sender_name TEXT NOT NULL, 
             destination_id TEXT NOT NULL, sent_timestamp TEXT NOT NULL, message TEXT NOT NULL
         )               
     ''')
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_messages_ts ON messages (sent_timestamp)")
     cursor.execute('''
         CREATE TABLE IF NOT EXISTS leave (
             id INTEGER PRIMARY KEY, user_id TEXT NOT NULL, user_name TEXT NOT NULL, 
             start_date TEXT NOT NULL, end_date TEXT NOT NULL
         )
     ''')
+    # Leading with end_date lets the "on leave today" lookup seek past finished leave instead of scanning
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_leave_end_date ON leave (end_date, start_date, user_id)")
     cursor.execute('''
         CREATE TABLE IF NOT EXISTS holidays (
             holiday_date TEXT PRIMARY KEY, description TEXT NOT NULL
@@ -66,73 +205,126 @@ def setup_database():
         )
     ''')
     # Seed initial data if tables are empty
-    cursor.execute("INSERT OR IGNORE INTO config (key, value) VALUES ('checkin_time', '08:00')")
-    cursor.execute("INSERT OR IGNORE INTO config (key, value) VALUES ('reminder_time', '10:00')")
-    cursor.execute("INSERT OR IGNORE INTO config (key, value) VALUES ('summary_time', '11:00')")
+    cursor.executemany("INSERT OR IGNORE INTO config (key, value) VALUES (?, ?)", DEFAULT_CONFIG)
     # Add the reporting user as the first admin
-    if REPORTING_USER_ID:
-        cursor.execute("INSERT OR IGNORE INTO admins (user_id) VALUES (?)", (REPORTING_USER_ID,))
-    conn.commit()
-    conn.close()
+    cursor.execute("INSERT OR IGNORE INTO admins (user_id) VALUES (?)", (REPORTING_USER_ID,))
+    _reload_holidays()
     logging.info("Database initialized.")
 
+def _reload_holidays():
+    """Refreshes the in-process holiday cache from the holidays table."""
+    global _HOLIDAYS, _HOLIDAYS_LOADED_AT
+    with DB_LOCK:
+        rows = db_connect().execute("SELECT holiday_date FROM holidays").fetchall()
+    _HOLIDAYS = {row[0] for row in rows}
+    _HOLIDAYS_LOADED_AT = time.monotonic()
+
 # --- Helper Functions ---
+def reload_config():
+    """Reloads the config cache and asks the scheduler thread to re-register its jobs."""
+    global _CONFIG
+    with DB_LOCK:
+        _CONFIG = {k: v for k, v in db_connect().execute("SELECT key, value FROM config").fetchall()}
+    _RESCHEDULE.set()
+
 def is_admin(user_id):
     """Checks if a user_id is in the admins table."""
-    conn = db_connect()
-    cursor = conn.cursor()
-    cursor.execute("SELECT 1 FROM admins WHERE user_id = ?", (user_id,))
-    is_admin_user = cursor.fetchone() is not None
-    conn.close()
-    return is_admin_user
+    with DB_LOCK:
+        cursor = db_connect().execute("SELECT 1 FROM admins WHERE user_id = ?", (user_id,))
+        return cursor.fetchone() is not None
 
 def is_workday(check_date):
     """Checks if a given date is a workday (not weekend or holiday)."""
     if check_date.weekday() >= 5: # Saturday or Sunday
         return False
-    conn = db_connect()
-    cursor = conn.cursor()
-    cursor.execute("SELECT 1 FROM holidays WHERE holiday_date = ?", (check_date.strftime("%Y-%m-%d"),))
-    is_holiday = cursor.fetchone() is not None
-    conn.close()
-    return not is_holiday
+    if time.monotonic() - _HOLIDAYS_LOADED_AT > HOLIDAY_CACHE_TTL:
+        _reload_holidays()
+    return check_date.isoformat() not in _HOLIDAYS
+
+def _refresh_users():
+    """Rebuilds the user caches for the whole workspace with a paginated users.list scan."""
+    global _BOT_IDS, _USERS_LOADED_AT
+    bot_ids = set()
+    cursor = None
+    while True:
+        result = app.client.users_list(cursor=cursor, limit=1000)
+        for user in result["members"]: # type: ignore
+            _USER_NAMES[user["id"]] = user["name"]
+            if user["is_bot"]:
+                bot_ids.add(user["id"])
+        cursor = result.get("response_metadata", {}).get("next_cursor")
+        if not cursor:
+            break
+    _BOT_IDS = bot_ids
+    _USERS_LOADED_AT = time.monotonic()
+
+def get_user_name(user_id):
+    """Returns a user's name, only calling users.info for users not seen in the last scan."""
+    if user_id not in _USER_NAMES:
+        user_info = app.client.users_info(user=user_id)
+        _USER_NAMES[user_id] = user_info["user"]["name"] # type: ignore
+    return _USER_NAMES[user_id]
+
+def get_thread_ts(day_str):
+    """Returns the ts of the check-in message posted on the given date, if any."""
+    with DB_LOCK:
+        row = db_connect().execute("SELECT value FROM config WHERE key = ?", ("thread_ts:" + day_str,)).fetchone()
+    return row[0] if row else None
+
+def save_thread_ts(day_str, ts):
+    """Records the ts of the check-in message so it survives restarts, dropping older days' entries."""
+    key = "thread_ts:" + day_str
+    with db_transaction() as conn:
+        conn.execute("DELETE FROM config WHERE key LIKE 'thread_ts:%' AND key < ?", (key,))
+        conn.execute("INSERT OR REPLACE INTO config (key, value) VALUES (?, ?)", (key, ts))
 
 def get_channel_members(channel_id):
     """Fetches a list of all non-bot members from a given channel."""
+    cached = _CHANNEL_MEMBERS_CACHE.get(channel_id)
+    if cached and time.monotonic() - cached[0] <= CHANNEL_MEMBERS_CACHE_TTL:
+        return cached[1]
+
     try:
-        result = app.client.conversations_members(channel=channel_id)
-        member_ids = result["members"]
+        if time.monotonic() - _USERS_LOADED_AT > USER_CACHE_TTL:
+            _refresh_users()
+
+        member_ids = []
+        cursor = None
+        while True:
+            result = app.client.conversations_members(channel=channel_id, cursor=cursor, limit=1000)
+            member_ids.extend(result["members"]) # type: ignore
+            cursor = result.get("response_metadata", {}).get("next_cursor")
+            if not cursor:
+                break
 
         # Filter out bots
-        human_members = []
-        for user_id in member_ids: # type: ignore
-            user_info = app.client.users_info(user=user_id)
-            if not user_info["user"]["is_bot"]: # type: ignore
-                human_members.append(user_id)
+        human_members = [user_id for user_id in member_ids if user_id not in _BOT_IDS]
+        _CHANNEL_MEMBERS_CACHE[channel_id] = (time.monotonic(), human_members)
         return human_members
     except Exception as e:
+        if cached:
+            # A stale list beats skipping everyone on this run
+            logging.error(f"Error fetching channel members, using cached list: {e}")
+            return cached[1]
         logging.error(f"Error fetching channel members: {e}")
         return []
 
-def is_user_on_leave(user_id, check_date):
-    """Checks if a user is on leave on a specific date."""
-    conn = db_connect()
-    cursor = conn.cursor()
-    cursor.execute("SELECT start_date, end_date FROM leave WHERE user_id = ?", (user_id,))
-    leave_periods = cursor.fetchall()
-    conn.close()
-
-    for start_str, end_str in leave_periods:
-        start_date = date.fromisoformat(start_str)
-        end_date = date.fromisoformat(end_str)
-        if start_date <= check_date <= end_date:
-            return True
-    return False
+def get_users_on_leave(check_date):
+    """Returns the set of user IDs on leave on a specific date."""
+    # ISO dates sort lexicographically, so the range check can be done on the stored strings
+    check_str = check_date.isoformat()
+    with DB_LOCK:
+        cursor = db_connect().execute(
+            "SELECT DISTINCT user_id FROM leave WHERE start_date <= ? AND end_date >= ?",
+            (check_str, check_str)
+        )
+        return {row[0] for row in cursor.fetchall()}
 
 # --- Core Bot Logic ---
 def post_daily_checkin(ignore_off_day=False):
     """Posts the daily check-in message to the target channel."""
     today = date.today() # Define today's date
+    today_str = today.isoformat()
 
     if not ignore_off_day and not is_workday(today):
         logging.info("It's a holiday or weekend, no check-in message sent.")        
@@ -141,23 +333,11 @@ def post_daily_checkin(ignore_off_day=False):
     try:
         # The rest of the message posting logic remains similar
         result = app.client.chat_postMessage(
-            channel=TARGET_CHANNEL_ID, # type: ignore
+            channel=TARGET_CHANNEL_ID,
             text="Good morning team! Please check in for the day.",
-            blocks=[
-                {"type": "section", "text": {"type": "mrkdwn", "text": "*Good morning! :sunrise: Please check in for today.*"}},
-                {"type": "actions", "block_id": "check_in_actions", "elements": [
-                    {"type": "button", "text": {"type": "plain_text", "text": "In at Normal Time"}, "style": "primary", "action_id": "action_in_normal"},
-                    {"type": "button", "text": {"type": "plain_text", "text": "In Late"}, "action_id": "action_in_late"},
-                    {"type": "button", "text": {"type": "plain_text", "text": "Working from Home"}, "action_id": "action_wfh"},
-                    {"type": "button", "text": {"type": "plain_text", "text": "Appointment"}, "action_id": "action_appointment"},
-                    {"type": "button", "text": {"type": "plain_text", "text": "Out Sick"}, "style": "danger", "action_id": "action_out_sick"},
-                    {"type": "button", "text": {"type": "plain_text", "text": "Liberty"}, "action_id": "action_liberty"},
-                    {"type": "button", "text": {"type": "plain_text", "text": "Other..."}, "action_id": "action_other"}
-                ]}
-            ]
-
+            blocks=CHECKIN_BLOCKS
         )
-        daily_thread_ts[today.strftime("%Y-%m-%d")] = result['ts']
+        save_thread_ts(today_str, result['ts'])
         logging.info(f"Daily check-in message sent to channel {TARGET_CHANNEL_ID}")
     except Exception as e:
         logging.error(f"Error posting daily message: {e}")
@@ -166,54 +346,59 @@ def post_daily_summary(ignore_off_day=False):
     today = date.today()
     if not ignore_off_day and not is_workday(today): return
 
-    today_str = today.strftime("%Y-%m-%d")
-    conn = db_connect()
-    cursor = conn.cursor()
-    cursor.execute("SELECT user_id, response_text, details FROM responses WHERE response_date = ?", (today_str,))
-    responses = cursor.fetchall()
-    conn.close()
+    today_str = today.isoformat()
+    with DB_LOCK:
+        cursor = db_connect().execute("SELECT user_id, response_text, details FROM responses WHERE response_date = ?", (today_str,))
+        responses = cursor.fetchall()
 
     if not responses:
         summary_text = f"*Daily Status Summary for {today_str}*\n\nNo one has checked in yet."
     else:
-        summary_text = f"*Daily Status Summary for {today_str}*\n"
-        for user_id, response, details in responses:
-            details_text = f" ({details})" if details else ""
-            summary_text += f"\n• <@{user_id}>: *{response}*{details_text}"
+        lines = [f"*Daily Status Summary for {today_str}*\n"]
+        lines.extend(
+            f"• <@{user_id}>: *{response}*" + (f" ({details})" if details else "")
+            for user_id, response, details in responses
+        )
+        summary_text = "\n".join(lines)
 
     try:
-        ts = daily_thread_ts.get(today_str)
-        app.client.chat_postMessage(channel=TARGET_CHANNEL_ID, text=summary_text, thread_ts=ts) # type: ignore
+        ts = get_thread_ts(today_str)
+        app.client.chat_postMessage(channel=TARGET_CHANNEL_ID, text=summary_text, thread_ts=ts)
         logging.info("Posted daily summary.")
     except Exception as e:
         logging.error(f"Failed to post daily summary: {e}")
 
+def _send_reminder(user_id):
+    """DMs a single user a check-in reminder."""
+    try:
+        app.client.chat_postMessage(
+            channel=user_id,
+            text="Just a friendly reminder to please check in for today! ☀️"
+        )
+        logging.info(f"Sent reminder to {user_id}")
+    except Exception as e:
+        logging.error(f"Failed to send reminder to {user_id}: {e}")
+
 def post_reminders(ignore_off_day=False):
     """Sends reminders to users who have not checked in."""
     today = date.today()
     if not ignore_off_day and not is_workday(today):
         return
 
-    today_str = today.strftime("%Y-%m-%d")
+    today_str = today.isoformat()
     
     try:
         all_channel_members = get_channel_members(TARGET_CHANNEL_ID)
         
-        conn = db_connect()
-        cursor = conn.cursor()
-        cursor.execute("SELECT user_id FROM responses WHERE response_date = ?", (today_str,))
-        responded_users = {row[0] for row in cursor.fetchall()}
-        conn.close()
-
-        missing_users = set(all_channel_members) - responded_users
-
-        for user_id in missing_users:
-            if not is_user_on_leave(user_id, today):
-                app.client.chat_postMessage(
-                    channel=user_id,
-                    text="Just a friendly reminder to please check in for today! ☀️"
-                )
-                logging.info(f"Sent reminder to {user_id}")
+        with DB_LOCK:
+            cursor = db_connect().execute("SELECT user_id FROM responses WHERE response_date = ?", (today_str,))
+            responded_users = {row[0] for row in cursor.fetchall()}
+
+        users_to_remind = set(all_channel_members) - responded_users - get_users_on_leave(today)
+
+        # Send the DMs concurrently so the total time is bounded by the slowest request
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            executor.map(_send_reminder, users_to_remind)
 
     except Exception as e:
         logging.error(f"Failed to send reminders: {e}")
@@ -222,22 +407,16 @@ def post_reminders(ignore_off_day=False):
 def handle_response(body, response_text, details=None):
     user_id = body["user"]["id"]
     user_name = body["user"]["name"]  # Get the user's name
-    today_str = date.today().strftime("%Y-%m-%d")
-    thread_ts = daily_thread_ts.get(today_str)
+    today_str = date.today().isoformat()
+    thread_ts = get_thread_ts(today_str)
 
     try:
-        conn = db_connect()
-        cursor = conn.cursor()
-        cursor.execute(
-            "INSERT OR REPLACE INTO responses (user_id, user_name, response_date, response_text, details) VALUES (?, ?, ?, ?, ?)",
-            (user_id, user_name, today_str, response_text, details)
-        )
-        conn.commit()
-        conn.close()
+        with db_transaction() as conn:
+            conn.execute(SQL_UPSERT_RESPONSE, (user_id, user_name, today_str, response_text, details))
 
         details_text = f" (Details: {details})" if details else ""
         app.client.chat_postMessage(
-            channel=TARGET_CHANNEL_ID, # type: ignore
+            channel=TARGET_CHANNEL_ID,
             thread_ts=thread_ts,
             text=f"<@{user_id}> has checked in: *{response_text}*{details_text}"
         )
@@ -251,36 +430,14 @@ def handle_response(body, response_text, details=None):
 def handle_simple_checkin(ack: Ack, body, logger, action):
     """Handles button clicks that don't require a modal."""
     ack()
-    response_map = {
-        "action_in_normal": "In at Normal Time",
-        "action_wfh": "Working from Home",
-        "action_out_sick": "Out Sick",
-        "action_liberty": "Liberty"
-    }
-    handle_response(body, response_map[action["action_id"]])
+    handle_response(body, _SIMPLE_RESPONSE_MAP[action["action_id"]])
 
 @app.action("action_in_late")
 @app.action("action_appointment")
 @app.action("action_other")
 def handle_modal_checkin(ack: Ack, body, client, action):
     ack()
-    action_map = {
-        "action_in_late": {"title": "In Late", "label": "What time do you expect to be in?", "placeholder": "e.g., 10:30 AM"},
-        "action_appointment": {"title": "Appointment", "label": "What are the details of the appointment?", "placeholder": "e.g., Dentist at 2 PM"},
-        "action_other": {"title": "Other Status", "label": "Please provide your status for the day.", "placeholder": "e.g., Working from the airport"}
-    }
-    config = action_map[action["action_id"]]
-    client.views_open(
-        trigger_id=body["trigger_id"],
-        view={
-            "type": "modal", "callback_id": f"modal_submit_{action['action_id']}",
-            "title": {"type": "plain_text", "text": config["title"]},
-            "submit": {"type": "plain_text", "text": "Submit"},
-            "blocks": [{"type": "input","block_id": "details_block",
-                        "element": {"type": "plain_text_input","action_id": "details_input", "placeholder": {"type": "plain_text", "text": config["placeholder"]}},
-                        "label": {"type": "plain_text", "text": config["label"]}}]
-        }
-    )
+    client.views_open(trigger_id=body["trigger_id"], view=_MODAL_VIEW_CACHE[action["action_id"]])
 
 @app.view("modal_submit_action_in_late")
 @app.view("modal_submit_action_appointment")
@@ -288,44 +445,53 @@ def handle_modal_checkin(ack: Ack, body, client, action):
 def handle_modal_submission(ack: Ack, body, view):
     """Handles the submission of the 'late arrival time' modal."""
     ack()
-    response_map = {
-        "modal_submit_action_in_late": "In Late", "modal_submit_action_appointment": "Appointment",
-        "modal_submit_action_other": "Other"
-    }
-    response_text = response_map[view["callback_id"]]
+    response_text = _MODAL_SUBMIT_MAP[view["callback_id"]]
     details = view["state"]["values"]["details_block"]["details_input"]["value"]
     handle_response(body, response_text, details)
 
 @app.event("message")
 def handle_message_events(body, logger):
-    """Logs all messages to the database."""
+    """Queues all messages to be logged to the database by the message log worker."""
     event = body.get("event", {})
     message_text = event.get("text")
     sender_id = event.get("user")
     destination_id = event.get("channel")
     sent_timestamp = event.get("ts")
 
-    # To get the sender's name, you need to make an API call
-    try:
-        user_info = app.client.users_info(user=sender_id)
-        sender_name = user_info["user"]["name"] # type: ignore
-    except Exception as e:
-        logger.error(f"Error fetching user info: {e}")
-        sender_name = "Unknown"
+    if message_text and sender_id and destination_id and sent_timestamp:
+        try:
+            _MSG_QUEUE.put_nowait((sender_id, destination_id, sent_timestamp, message_text))
+        except queue.Full:
+            logger.error(f"Message log queue is full, dropping message {sent_timestamp}")
 
+def run_message_logger():
+    """Drains queued message events and writes them to the database in batches."""
+    while True:
+        batch = [_MSG_QUEUE.get()]
+        deadline = time.monotonic() + MESSAGE_BATCH_WINDOW
+        while len(batch) < MESSAGE_BATCH_SIZE:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(_MSG_QUEUE.get(timeout=remaining))
+            except queue.Empty:
+                break
+
+        rows = []
+        for sender_id, destination_id, sent_timestamp, message_text in batch:
+            try:
+                sender_name = get_user_name(sender_id)
+            except Exception as e:
+                logging.error(f"Error fetching user info: {e}")
+                sender_name = "Unknown"
+            rows.append((sender_id, sender_name, destination_id, sent_timestamp, message_text))
 
-    if message_text and sender_id and destination_id and sent_timestamp:
         try:
-            conn = db_connect()
-            cursor = conn.cursor()
-            cursor.execute(
-                "INSERT INTO messages (sender_id, sender_name, destination_id, sent_timestamp, message) VALUES (?, ?, ?, ?, ?)",
-                (sender_id, sender_name, destination_id, sent_timestamp, message_text)
-            )
-            conn.commit()
-            conn.close()
+            with db_transaction() as conn:
+                conn.executemany(SQL_INSERT_MESSAGE, rows)
         except Exception as e:
-            logger.error(f"Error logging message to database: {e}")
+            logging.error(f"Error logging messages to database: {e}")
 
 # --- Slash Command Handlers --- 
 def register_commands(app):
@@ -368,29 +534,7 @@ def register_commands(app):
         """Opens a modal for the user to register their leave dates."""
         ack()
         try:
-            client.views_open(
-                trigger_id=body["trigger_id"],
-                view={
-                    "type": "modal",
-                    "callback_id": "leave_modal",
-                    "title": {"type": "plain_text", "text": "Register Leave/PTO"},
-                    "submit": {"type": "plain_text", "text": "Submit"},
-                    "blocks": [
-                        {
-                            "type": "input",
-                            "block_id": "start_date_block",
-                            "element": {"type": "datepicker", "action_id": "start_date_picker"},
-                            "label": {"type": "plain_text", "text": "Start Date"}
-                        },
-                        {
-                            "type": "input",
-                            "block_id": "end_date_block",
-                            "element": {"type": "datepicker", "action_id": "end_date_picker"},
-                            "label": {"type": "plain_text", "text": "End Date"}
-                        }
-                    ]
-                }
-            )
+            client.views_open(trigger_id=body["trigger_id"], view=LEAVE_MODAL_VIEW)
         except Exception as e:
             logger.error(f"Error opening 'leave' modal: {e}")
 
@@ -404,20 +548,17 @@ def register_commands(app):
         start_date = values["start_date_block"]["start_date_picker"]["selected_date"]
         end_date = values["end_date_block"]["end_date_picker"]["selected_date"]
 
-        if not start_date or not end_date or (parse(end_date) < parse(start_date)):
+        if not start_date or not end_date or end_date < start_date:
             # You can also send an ephemeral message back to the user here
             logger.error("Invalid date range submitted for leave.")
             return
 
         try:
-            conn = db_connect()
-            cursor = conn.cursor()
-            cursor.execute(
-                "INSERT INTO leave (user_id, user_name, start_date, end_date) VALUES (?, ?, ?, ?)",
-                (user_id, user_name, start_date, end_date)
-            )
-            conn.commit()
-            conn.close()
+            with db_transaction() as conn:
+                conn.execute(
+                    "INSERT INTO leave (user_id, user_name, start_date, end_date) VALUES (?, ?, ?, ?)",
+                    (user_id, user_name, start_date, end_date)
+                )
             app.client.chat_postEphemeral(
                 channel=TARGET_CHANNEL_ID,
                 user=user_id,
@@ -475,12 +616,10 @@ def register_commands(app):
         
         holiday_date, description = parts
         try:
-            parsed_date = parse(holiday_date).strftime("%Y-%m-%d")
-            conn = db_connect()
-            cursor = conn.cursor()
-            cursor.execute("INSERT OR REPLACE INTO holidays (holiday_date, description) VALUES (?, ?)", (parsed_date, description))
-            conn.commit()
-            conn.close()
+            parsed_date = date.fromisoformat(holiday_date).isoformat()
+            with db_transaction() as conn:
+                conn.execute("INSERT OR REPLACE INTO holidays (holiday_date, description) VALUES (?, ?)", (parsed_date, description))
+            _reload_holidays()
             say(f":tada: Holiday '{description}' on {parsed_date} has been added.")
         except Exception as e:
             say(f"Sorry, I couldn't understand that date. Please use a format like YYYY-MM-DD. Error: {e}")
@@ -506,27 +645,29 @@ def register_commands(app):
         say("Config feature coming soon!")
 
 # --- Scheduling ---
+def _schedule_jobs():
+    """Registers the daily tasks using the cached config times."""
+    schedule.clear()
+    # Each task skips weekends and holidays itself, so one daily job per task is enough
+    schedule.every().day.at(_CONFIG.get('checkin_time', '08:00')).do(post_daily_checkin)
+    schedule.every().day.at(_CONFIG.get('summary_time', '11:00')).do(post_daily_summary)
+    schedule.every().day.at(_CONFIG.get('reminder_time', '10:00')).do(post_reminders)
+    logging.info("Scheduler configured.")
+
 def run_schedule():
     """Sets up and runs the scheduled tasks based on config."""
-    conn = db_connect()
-    cursor = conn.cursor()
-    configs = {k: v for k, v in cursor.execute("SELECT key, value FROM config").fetchall()}
-    conn.close()
-
-    # Schedule tasks using times from the database
-    schedule.every().monday.at(configs.get('checkin_time', '08:00')).do(post_daily_checkin)
-    schedule.every().tuesday.at(configs.get('checkin_time', '08:00')).do(post_daily_checkin)
-    schedule.every().wednesday.at(configs.get('checkin_time', '08:00')).do(post_daily_checkin)
-    schedule.every().thursday.at(configs.get('checkin_time', '08:00')).do(post_daily_checkin)
-    schedule.every().friday.at(configs.get('checkin_time', '08:00')).do(post_daily_checkin)
-    
-    schedule.every().day.at(configs.get('summary_time', '11:00')).do(post_daily_summary)
-    schedule.every().day.at(configs.get('reminder_time', '10:00')).do(post_reminders) # Use the post_reminders function
+    reload_config()
 
-    logging.info("Scheduler configured and running.")
+    logging.info("Scheduler running.")
     while True:
+        # Jobs are only touched from this thread; reload_config() just flags a change
+        if _RESCHEDULE.is_set():
+            _RESCHEDULE.clear()
+            _schedule_jobs()
         schedule.run_pending()
-        time.sleep(1)
+        # Sleep until the next job is due (capped at a minute); a config reload wakes us early
+        idle_seconds = schedule.idle_seconds()
+        _RESCHEDULE.wait(60 if idle_seconds is None else min(max(idle_seconds, 0), 60))
 
 # --- App Entry Point ---
 if __name__ == "__main__":
@@ -537,4 +678,8 @@ if __name__ == "__main__":
     scheduler_thread.daemon = True
     scheduler_thread.start()
 
+    message_logger_thread = Thread(target=run_message_logger)
+    message_logger_thread.daemon = True
+    message_logger_thread.start()
+
     SocketModeHandler(app, SLACK_APP_TOKEN).start()